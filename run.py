@@ -1,22 +1,56 @@
-from bauhaus import Encoding, proposition, constraint
+from bauhaus import Encoding, proposition, constraint, And, Or
 from bauhaus.utils import count_solutions, likelihood
-from nnf import config
+from nnf import And as NNFAnd, config, dimacs, dsharp
+import contextlib
+import functools
+import io
+import multiprocessing
+import os
 import random
 
 # Setting up the SAT solver backend for efficient processing
 config.sat_backend = "kissat"
 E = Encoding()
 
+# Module RNG; seed it for reproducible deals and therefore reusable counts.
+_rng = random.Random()
+
+def set_seed(seed):
+    """Seeds the deal RNG so simulation runs are reproducible."""
+    _rng.seed(seed)
+
 # Constants for the deck
 RANKS = list(range(1, 14))  # 1 for Ace, 11 for Jack, 12 for Queen, 13 for King
 SUITS = ["hearts", "diamonds", "clubs", "spades"]
 
+PLAYERS = ("Player A", "Player B")
+NUM_CARDS = 52
+# Each tie-break window consumes four rounds (three face down, one face up).
+MAX_TIE_DEPTH = 3
+# Rounds of the base game, shared by every encoding loop instead of
+# rebuilding the range per call.
+ROUNDS = tuple(range(1, 27))
+TOTAL_ROUNDS = len(ROUNDS)
+
+# Rounds 1..26 plus the worst-case tie-break window.
+MAX_ROUND = 26 + 4 * MAX_TIE_DEPTH
+
+# Rank-pair tables, computed once at module load. Which rank beats
+# which never changes, so every encoding loop walks these instead of
+# re-comparing ranks pair by pair.
+HIGHER_PAIRS = tuple((rank_x, rank_y) for rank_x in RANKS for rank_y in RANKS if rank_x > rank_y)
+SAME_PAIRS = tuple((rank, rank) for rank in RANKS)
+
+# High cards: 10, Jack, Queen, King, Ace. A frozenset makes the
+# membership test O(1) instead of a linear scan of a literal list.
+HIGH_RANKS = frozenset({1, 10, 11, 12, 13})
+
 @proposition(E)
 class Card:
     def __init__(self, rank, suit):
         self.rank = rank
         self.suit = suit
-    def __repr__(self):
+    def _prop_name(self):
         return f"{self.rank} of {self.suit}"
 
 @proposition(E)
@@ -24,7 +58,7 @@ class Owns:
     def __init__(self, player, card):
         self.player = player
         self.card = card
-    def __repr__(self):
+    def _prop_name(self):
         return f"{self.player} owns {self.card}"
 
 @proposition(E)
@@ -33,7 +67,7 @@ class Plays:
         self.player = player
         self.card = card
         self.round_number = round_number
-    def __repr__(self):
+    def _prop_name(self):
         return f"{self.player} plays {self.card} in round {self.round_number}"
 
 @proposition(E)
@@ -41,202 +75,476 @@ class Wins:
     def __init__(self, player, round_number):
         self.player = player
         self.round_number = round_number
-    def __repr__(self):
+    def _prop_name(self):
         return f"{self.player} wins round {self.round_number}"
 
 @proposition(E)
 class Tie:
     def __init__(self, round_number):
         self.round_number = round_number
-    def __repr__(self):
+    def _prop_name(self):
         return f"Tie in round {self.round_number}"
 
 @proposition(E)
 class FinalTie:
     def __init__(self, round_number):
         self.round_number = round_number
-    def __repr__(self):
+    def _prop_name(self):
         return f"Final unresolved tie in round {self.round_number}"
 
 @proposition(E)
 class HigherRank:
-    def __init__(self, card1, card2):
-        self.card1 = card1
-        self.card2 = card2
-    def __repr__(self):
-        return f"{self.card1} > {self.card2}"
+    def __init__(self, rank1, rank2):
+        self.rank1 = rank1
+        self.rank2 = rank2
+    def _prop_name(self):
+        return f"rank {self.rank1} > rank {self.rank2}"
 
 @proposition(E)
 class SameRank:
-    def __init__(self, card1, card2):
-        self.card1 = card1
-        self.card2 = card2
-    def __repr__(self):
-        return f"{self.card1} == {self.card2}"
+    def __init__(self, rank1, rank2):
+        self.rank1 = rank1
+        self.rank2 = rank2
+    def _prop_name(self):
+        return f"rank {self.rank1} == rank {self.rank2}"
+
+@proposition(E)
+class CounterVar:
+    """Auxiliary variable for the at-most-one encodings."""
+    def __init__(self, tag, index):
+        self.tag = tag
+        self.index = index
+    def _prop_name(self):
+        return f"counter {self.tag}[{self.index}]"
+
+@proposition(E)
+class CountAtLeast:
+    """Unary win-counter variable: the player wins at least `count` of
+    the first `prefix` rounds."""
+    def __init__(self, player, prefix, count):
+        self.player = player
+        self.prefix = prefix
+        self.count = count
+    def _prop_name(self):
+        return f"{self.player} wins >= {self.count} of first {self.prefix} rounds"
 
 @proposition(E)
 class OverallWinner:
     def __init__(self, player):
         self.player = player
-    def __repr__(self):
+    def _prop_name(self):
         return f"Overall winner is {self.player}"
 
-# Global deck of cards
-deck = [Card(rank, suit) for rank in RANKS for suit in SUITS]
+# Memoized factories so repeated references to the same proposition reuse
+# one object instead of allocating a fresh one on every call.
+@functools.lru_cache(maxsize=None)
+def _card(rank, suit):
+    return Card(rank, suit)
+
+@functools.lru_cache(maxsize=None)
+def _wins(player, round_number):
+    return Wins(player, round_number)
+
+@functools.lru_cache(maxsize=None)
+def _tie(round_number):
+    return Tie(round_number)
+
+@functools.lru_cache(maxsize=None)
+def _final_tie(round_number):
+    return FinalTie(round_number)
+
+@functools.lru_cache(maxsize=None)
+def _overall_winner(player):
+    return OverallWinner(player)
+
+@functools.lru_cache(maxsize=None)
+def _higher_rank(rank1, rank2):
+    return HigherRank(rank1, rank2)
+
+@functools.lru_cache(maxsize=None)
+def _same_rank(rank1, rank2):
+    return SameRank(rank1, rank2)
+
+# Global deck of cards; card index i maps to rank i//4 + 1, suit i%4
+deck = [_card(rank, suit) for rank in RANKS for suit in SUITS]
+
+_PLAYER_INDEX = {player: i for i, player in enumerate(PLAYERS)}
+_CARD_INDEX = {card: i for i, card in enumerate(deck)}
+
+def card_index(rank, suit):
+    """Dense 0..51 index of a card: four suit slots per rank."""
+    return (rank - 1) * 4 + SUITS.index(suit)
+
+# Dense proposition lookup tables indexed by small integers, built
+# once at module load. The encoding loops reference the same Plays and
+# Owns propositions millions of times, so an indexed list lookup beats
+# re-hashing (player, card, round) tuples on every mention.
+PLAYS_TABLE = [
+    [[Plays(player, card, round_number) for round_number in range(1, MAX_ROUND + 1)]
+     for card in deck]
+    for player in PLAYERS
+]
+OWNS_A_TABLE = [Owns("Player A", card) for card in deck]
+
+# Negated ownership literals, built once. Every Player B ownership
+# reference shares these nodes instead of allocating a fresh negation
+# per use (the tie windows alone reference them thousands of times).
+NOT_OWNS_A_TABLE = [~prop for prop in OWNS_A_TABLE]
+
+# Per-round views of PLAYS_TABLE: every card a player could play in a
+# given round, as one shared list per (player, round) instead of a
+# fresh 52-element comprehension at every use.
+PLAYS_BY_ROUND = [
+    [[PLAYS_TABLE[p][c][r] for c in range(NUM_CARDS)] for r in range(MAX_ROUND)]
+    for p in range(len(PLAYERS))
+]
+
+def plays_in_round(player, round_number):
+    return PLAYS_BY_ROUND[_PLAYER_INDEX[player]][round_number - 1]
+
+def _plays(player, card, round_number):
+    if round_number <= MAX_ROUND:
+        return PLAYS_TABLE[_PLAYER_INDEX[player]][_CARD_INDEX[card]][round_number - 1]
+    return Plays(player, card, round_number)
+
+def _owns(player, card):
+    if player == "Player A":
+        return OWNS_A_TABLE[_CARD_INDEX[card]]
+    return Owns(player, card)
+
+def owned_by(player, card):
+    """Ownership literal for a player.
+
+    With two players every card is owned by exactly one of them, so
+    Player B's ownership is just the negation of Player A's. This
+    halves the ownership variables and removes the need for exclusive
+    ownership constraints.
+    """
+    if player == "Player A":
+        return _owns("Player A", card)
+    return NOT_OWNS_A_TABLE[_CARD_INDEX[card]]
 
 def shuffle_and_setup_deck():
-    """Shuffles the deck once and sets up initial ownership."""
-    shuffled_deck = deck.copy()
-    random.shuffle(shuffled_deck)
+    """Shuffles the deck once and deals the two hands."""
+    shuffled_deck = _rng.sample(deck, NUM_CARDS)
 
     midpoint = len(shuffled_deck) // 2
-    player_a_cards = shuffled_deck[:midpoint]
-    player_b_cards = shuffled_deck[midpoint:]
-
-    for card in player_a_cards:
-        E.add_constraint(Owns("Player A", card))
-    for card in player_b_cards:
-        E.add_constraint(Owns("Player B", card))
+    return shuffled_deck[:midpoint], shuffled_deck[midpoint:]
+
+def deal_facts(player_a_cards, player_b_cards):
+    """The ownership facts of a concrete deal, as one conjunction.
+
+    Deals are the per-iteration part of the encoding: they are
+    returned as a formula instead of being added to the shared
+    encoding, so the static game rules can be compiled once and each
+    iteration only conjoins its own 52 unit facts.
+    """
+    facts = [owned_by("Player A", card) for card in player_a_cards]
+    facts += [owned_by("Player B", card) for card in player_b_cards]
+    return And(facts)
+
+def evaluate_ground_deal(player_a_cards, player_b_cards):
+    """Plays out a fully determined deal in plain Python.
+
+    Once both hands are fixed and played in dealt order there is no
+    nondeterminism left in the round-by-round comparison, so invoking
+    the SAT solver only re-derives what a direct rank comparison
+    already tells us. Returns (wins_a, wins_b, ties) over the 26
+    rounds.
+    """
+    wins_a = wins_b = ties = 0
+    for card_a, card_b in zip(player_a_cards, player_b_cards):
+        if card_a.rank > card_b.rank:
+            wins_a += 1
+        elif card_b.rank > card_a.rank:
+            wins_b += 1
+        else:
+            ties += 1
+    return wins_a, wins_b, ties
+
+def setup_suit_symmetry_breaking():
+    """Lex-leader symmetry breaking over the interchangeable suits.
+
+    No game rule ever looks at a card's suit, so permuting the four
+    suits in any solution yields another solution and inflates model
+    counts by up to 4! = 24. For each adjacent suit pair, require
+    Player A's rank-ordered ownership vector for the first suit to be
+    lexicographically >= the vector for the second suit, keeping one
+    representative per suit permutation.
+
+    Only meaningful when ownership is left open: a concrete deal from
+    shuffle_and_setup_deck already fixes a single representative.
+    """
+    for suit_x, suit_y in zip(SUITS, SUITS[1:]):
+        prefix_equal = None
+        for rank in RANKS:
+            x = _owns("Player A", _card(rank, suit_x))
+            y = _owns("Player A", _card(rank, suit_y))
+            no_flip = y >> x
+            if prefix_equal is None:
+                E.add_constraint(no_flip)
+            else:
+                E.add_constraint(prefix_equal >> no_flip)
+            same = (x & y) | (~x & ~y)
+            prefix_equal = same if prefix_equal is None else prefix_equal & same
 
-@constraint(E)
 def setup_rank_comparisons():
-    """Defines higher and same rank constraints for all card pairs."""
-    for card_x in deck:
-        for card_y in deck:
-            if card_x.rank > card_y.rank:
-                E.add_constraint(HigherRank(card_x, card_y))
-            elif card_x.rank == card_y.rank:
-                E.add_constraint(SameRank(card_x, card_y))
-
-@constraint(E)
-def enforce_game_rules():
-    """Core game rules including playing, winning, and tie conditions."""
-    for round_number in range(1, 27):
-        plays_A = [Plays("Player A", card, round_number) for card in deck]
-        plays_B = [Plays("Player B", card, round_number) for card in deck]
+    """Defines higher and same rank facts for all rank pairs.
 
-        E.add_constraint(one_of(plays_A))
-        E.add_constraint(one_of(plays_B))
+    Rank comparisons depend only on the 13 ranks, not the 52 cards, so
+    13x13 = 169 facts replace the old 52x52 = 2704 card-pair facts.
+    """
+    for rank_x, rank_y in HIGHER_PAIRS:
+        E.add_constraint(_higher_rank(rank_x, rank_y))
+    for rank_x, rank_y in SAME_PAIRS:
+        E.add_constraint(_same_rank(rank_x, rank_y))
 
-        for card_x in deck:
-            for card_y in deck:
-                E.add_constraint(Plays("Player A", card_x, round_number) >> Owns("Player A", card_x))
-                E.add_constraint(Plays("Player B", card_y, round_number) >> Owns("Player B", card_y))
+def plays_any_suit(player, rank, round_number):
+    """Disjunction over suits: the player plays some card of this rank."""
+    base = (rank - 1) * len(SUITS)
+    return Or(plays_in_round(player, round_number)[base:base + len(SUITS)])
 
-                E.add_constraint(
-                    (Plays("Player A", card_x, round_number) & Plays("Player B", card_y, round_number) & HigherRank(card_x, card_y)) >>
-                    Wins("Player A", round_number)
-                )
-                E.add_constraint(
-                    (Plays("Player B", card_y, round_number) & Plays("Player A", card_x, round_number) & HigherRank(card_y, card_x)) >>
-                    Wins("Player B", round_number)
-                )
-                E.add_constraint(
-                    (Plays("Player A", card_x, round_number) & Plays("Player B", card_y, round_number) & SameRank(card_x, card_y)) >>
-                    Tie(round_number)
-                )
+def enforce_game_rules():
+    """Core game rules including playing, winning, and tie conditions."""
+    # One plays-implies-owns implication per (card, round), hoisted out
+    # of the per-round clause loops and covering the tie-break rounds
+    # past 26 as well, so tie-break plays also respect ownership.
+    ownership = []
+    for round_number in range(1, MAX_ROUND + 1):
+        for card in deck:
+            ownership.append(_plays("Player A", card, round_number) >> owned_by("Player A", card))
+            ownership.append(_plays("Player B", card, round_number) >> owned_by("Player B", card))
+    E.add_constraint(And(ownership))
+
+    for round_number in ROUNDS:
+        # One conjunction per round so bauhaus is entered once per
+        # round instead of once per clause.
+        E.add_constraint(And(build_round_clauses(round_number)))
+
+def build_round_clauses(round_number):
+    """Builds the clause list for one round of play.
+
+    Rounds share no state at generation time beyond the global
+    proposition tables, so each round's clauses can be generated
+    independently and merged by the caller.
+    """
+    plays_A = plays_in_round("Player A", round_number)
+    plays_B = plays_in_round("Player B", round_number)
+
+    clauses = [
+        exactly_one(plays_A, ("Player A plays", round_number)),
+        exactly_one(plays_B, ("Player B plays", round_number)),
+    ]
+
+    plays_A_by_rank = {rank: plays_any_suit("Player A", rank, round_number) for rank in RANKS}
+    plays_B_by_rank = {rank: plays_any_suit("Player B", rank, round_number) for rank in RANKS}
+
+    for rank_x, rank_y in HIGHER_PAIRS:
+        clauses.append(
+            (plays_A_by_rank[rank_x] & plays_B_by_rank[rank_y] & _higher_rank(rank_x, rank_y)) >>
+            _wins("Player A", round_number)
+        )
+        clauses.append(
+            (plays_B_by_rank[rank_x] & plays_A_by_rank[rank_y] & _higher_rank(rank_x, rank_y)) >>
+            _wins("Player B", round_number)
+        )
+    for rank_x, rank_y in SAME_PAIRS:
+        clauses.append(
+            (plays_A_by_rank[rank_x] & plays_B_by_rank[rank_y] & _same_rank(rank_x, rank_y)) >>
+            _tie(round_number)
+        )
 
-        E.add_constraint(Wins("Player A", round_number) | Wins("Player B", round_number) | Tie(round_number))
-        E.add_constraint(~(Wins("Player A", round_number) & Wins("Player B", round_number)))
+    clauses.append(_wins("Player A", round_number) | _wins("Player B", round_number) | _tie(round_number))
+    clauses.append(~(_wins("Player A", round_number) & _wins("Player B", round_number)))
+
+    return clauses
 
-@constraint(E)
 def handle_tie_breaking():
     """Improved tie-breaking logic using quantifiers."""
-    for round_number in range(1, 27):
+    for round_number in ROUNDS:
         E.add_constraint(
-            Tie(round_number) >>
+            _tie(round_number) >>
             resolve_tie_with_quantifiers(round_number)
         )
 
 def resolve_tie_with_quantifiers(initial_round):
-    """Recursive resolution of ties using quantifiers."""
+    """Bounded unrolled resolution of ties.
+
+    Unrolls up to MAX_TIE_DEPTH tie-break windows of four rounds each,
+    chained so a deeper window only applies when the previous window's
+    face-up cards tied again; if no window is decisive the tie stands
+    as a FinalTie. The old version looped `while True` with a
+    Python-level break on Wins(...) propositions, which are always
+    truthy, so the bound was accidental and the emitted rounds could
+    grow past any fixed horizon.
+    """
     constraints = []
-    tie_round = 0
+    window_guard = None
 
-    while True:
+    for tie_round in range(0, 4 * MAX_TIE_DEPTH, 4):
         current_round = initial_round + tie_round
-
-        for player in ["Player A", "Player B"]:
-            constraints.append(
-                all(
-                    Plays(player, card, current_round + i)
-                    for i, card in enumerate(deck[:3])
+        window_clauses = []
+
+        # Three cards face down: each player plays some card they own
+        # in each of the three rounds. Which cards is left open; pinning
+        # both players to the same fixed cards would contradict the
+        # ownership implications and make ties unsatisfiable.
+        for i in range(3):
+            for player in ["Player A", "Player B"]:
+                window_clauses.append(
+                    Or([
+                        _plays(player, card, current_round + i) &
+                        owned_by(player, card)
+                        for card in deck
+                    ])
                 )
-            )
 
         face_up_constraints = []
-        for player, opponent in [("Player A", "Player B"), ("Player B", "Player A")]:
+        for player in ["Player A", "Player B"]:
             face_up_constraints.append(
-                any(
-                    Plays(player, card, current_round + 3) &
-                    ~Owns(opponent, card)
+                Or([
+                    _plays(player, card, current_round + 3) &
+                    owned_by(player, card)
                     for card in deck
-                )
+                ])
+            )
+        window_clauses.append(And(face_up_constraints))
+
+        for rank_x, rank_y in HIGHER_PAIRS:
+            window_clauses.append(
+                (plays_any_suit("Player A", rank_x, current_round + 3) &
+                 plays_any_suit("Player B", rank_y, current_round + 3) &
+                 _higher_rank(rank_x, rank_y)) >>
+                _wins("Player A", initial_round)
+            )
+            window_clauses.append(
+                (plays_any_suit("Player B", rank_x, current_round + 3) &
+                 plays_any_suit("Player A", rank_y, current_round + 3) &
+                 _higher_rank(rank_x, rank_y)) >>
+                _wins("Player B", initial_round)
             )
-        constraints.append(all(face_up_constraints))
-
-        decisive_constraints = []
-        for card_x in deck:
-            for card_y in deck:
-                decisive_constraints.append(
-                    (Plays("Player A", card_x, current_round + 3) &
-                     Plays("Player B", card_y, current_round + 3) &
-                     HigherRank(card_x, card_y)) >>
-                    Wins("Player A", initial_round)
-                )
-                decisive_constraints.append(
-                    (Plays("Player B", card_x, current_round + 3) &
-                     Plays("Player A", card_y, current_round + 3) &
-                     HigherRank(card_x, card_y)) >>
-                    Wins("Player B", initial_round)
-                )
-        constraints.append(any(decisive_constraints))
 
-        if Wins("Player A", initial_round) or Wins("Player B", initial_round):
-            break
+        window = And(window_clauses)
+        constraints.append(window if window_guard is None else window_guard >> window)
 
-        tie_round += 4
+        # The next window applies only if this window's face-up cards
+        # tied again.
+        tied_again = Or([
+            plays_any_suit("Player A", rank, current_round + 3) &
+            plays_any_suit("Player B", rank, current_round + 3)
+            for rank in RANKS
+        ])
+        window_guard = tied_again if window_guard is None else window_guard & tied_again
 
     constraints.append(
-        ~Wins("Player A", initial_round) & ~Wins("Player B", initial_round) >>
-        FinalTie(initial_round)
+        (~_wins("Player A", initial_round) & ~_wins("Player B", initial_round)) >>
+        _final_tie(initial_round)
     )
 
-    return all(constraints)
+    return And(constraints)
+
+def _win_count_definitions(player):
+    """Unary sequential counter over a player's 26 round wins.
+
+    Returns (count_ge, clauses) where count_ge[k-1] is the proposition
+    "player wins at least k rounds overall" and the clauses define
+    every counter variable in both directions, so counts are exact.
+    """
+    clauses = []
+    prev = None
+    for prefix in ROUNDS:
+        win = _wins(player, prefix)
+        row = {}
+        for count in range(1, prefix + 1):
+            counter = CountAtLeast(player, prefix, count)
+            if count == 1:
+                definition = win if prefix == 1 else (prev[1] | win)
+            elif count == prefix:
+                definition = prev[count - 1] & win
+            else:
+                definition = prev[count] | (prev[count - 1] & win)
+            clauses.append(counter >> definition)
+            clauses.append(definition >> counter)
+            row[count] = counter
+        prev = row
+    count_ge = [prev[count] for count in ROUNDS]
+    return count_ge, clauses
 
-@constraint(E)
 def determine_overall_winner():
-    """Determines the overall winner based on total rounds won."""
-    total_wins_a = sum([Wins("Player A", r) for r in range(1, 27)])
-    total_wins_b = sum([Wins("Player B", r) for r in range(1, 27)])
-
-    E.add_constraint((total_wins_a > total_wins_b) >> OverallWinner("Player A"))
-    E.add_constraint((total_wins_b > total_wins_a) >> OverallWinner("Player B"))
-    E.add_constraint((total_wins_a == total_wins_b) >> FinalTie("game"))
-
-def one_of(plays):
-    """Ensures exactly one of the given plays occurs."""
-    return any(plays) & all(~plays[i] | ~plays[j] for i in range(len(plays)) for j in range(len(plays)) if i != j)
-    
-def biased_shuffle():
+    """Determines the overall winner based on total rounds won.
+
+    Compares the two win totals through unary counters: A is ahead of
+    B exactly when some threshold k is reached by A but not by B. The
+    old sum(...) > sum(...) comparison applied Python arithmetic to
+    proposition objects, which is not defined, rather than encoding a
+    cardinality comparison.
+    """
+    count_a, clauses_a = _win_count_definitions("Player A")
+    count_b, clauses_b = _win_count_definitions("Player B")
+    clauses = clauses_a + clauses_b
+
+    a_ahead = Or([count_a[k] & ~count_b[k] for k in range(26)])
+    b_ahead = Or([count_b[k] & ~count_a[k] for k in range(26)])
+
+    clauses.append(a_ahead >> _overall_winner("Player A"))
+    clauses.append(b_ahead >> _overall_winner("Player B"))
+    clauses.append((~a_ahead & ~b_ahead) >> _final_tie("game"))
+    E.add_constraint(And(clauses))
+
+def exactly_one(variables, tag):
+    """Exactly one of the given variables is true.
+
+    Uses the binary (log) at-most-one encoding: ceil(log2 n) auxiliary
+    bit variables per call, where selecting variable i forces the bit
+    pattern of i, so no two variables can be selected together. For a
+    52-card list that is 6 auxiliaries instead of the 51 the
+    sequential counter needed, with O(n log n) binary clauses. The tag
+    keeps the auxiliary variables of different call sites distinct.
+    """
+    n = len(variables)
+    if n == 1:
+        return variables[0]
+    bits = (n - 1).bit_length()
+    aux = [CounterVar(tag, k) for k in range(bits)]
+    clauses = [Or(variables)]
+    for i, variable in enumerate(variables):
+        for k in range(bits):
+            clauses.append(variable >> (aux[k] if (i >> k) & 1 else ~aux[k]))
+    return And(clauses)
+
+
+def biased_shuffle(high_cards_to_a, total_high_cards):
     """Biased shuffle to provide strategic advantages."""
      # Separate high cards and others
-    high_cards = [card for card in deck if card.rank in [10, 11, 12, 13, 1]]  # High cards: 10, Jack, Queen, King, Ace
-    other_cards = [card for card in deck if card.rank not in [10, 11, 12, 13, 1]]
-    
+    high_cards = [card for card in deck if card.rank in HIGH_RANKS]
+    other_cards = [card for card in deck if card.rank not in HIGH_RANKS]
+
     # Shuffle both pools
-    random.shuffle(high_cards)
-    random.shuffle(other_cards)
-    
+    _rng.shuffle(high_cards)
+    _rng.shuffle(other_cards)
+
     # Ensuring that the number of high cards to A does not exceed available high cards
-    high_cards_to_a = min(high_cards_to_a, len(high_cards), total_high_cards)
+    total_high_cards = min(total_high_cards, len(high_cards))
+    high_cards_to_a = min(high_cards_to_a, total_high_cards)
     high_cards_to_b = total_high_cards - high_cards_to_a
-    
-    # Build a biased deck: a specific number of high cards to Player A, rest to Player B
-    biased_deck = high_cards[:high_cards_to_a] + other_cards + high_cards[-high_cards_to_b:]
-    random.shuffle(biased_deck)  # Optional: Shuffle the biased deck to mix high cards within each player's portion
 
-    return biased_deck
+    # Build a biased deck: a specific number of high cards to Player A, rest to
+    # Player B. High cards outside the quotas fall back into the neutral pool,
+    # and the slices cover the whole high-card list, so no card is dropped or
+    # duplicated even when a quota is zero (a negative-zero slice like
+    # high_cards[-0:] would duplicate the entire list).
+    b_start = len(high_cards) - high_cards_to_b
+    other_cards += high_cards[high_cards_to_a:b_start]
+    _rng.shuffle(other_cards)
+    biased_deck = high_cards[:high_cards_to_a] + other_cards + high_cards[b_start:]
+
+    # Shuffle each player's half separately so the bias survives
+    midpoint = len(biased_deck) // 2
+    top, bottom = biased_deck[:midpoint], biased_deck[midpoint:]
+    _rng.shuffle(top)
+    _rng.shuffle(bottom)
+
+    return top + bottom
 
 def setup_strategic_card_distribution():
     """Distribute cards strategically after a biased shuffle."""
@@ -244,74 +552,408 @@ def setup_strategic_card_distribution():
     midpoint = len(biased_deck) // 2
     player_a_cards = biased_deck[:midpoint]
     player_b_cards = biased_deck[midpoint:]
-    for card in player_a_cards:
-        E.add_constraint(Owns("Player A", card))
-    for card in player_b_cards:
-        E.add_constraint(Owns("Player B", card))
-        
+    return player_a_cards, player_b_cards
+
 def enforce_variable_win_conditions():
     """Add additional win conditions based on sequences or card combinations."""
-    for round_number in range(1, 27):
-        for i in range(len(deck) - 1):
-            card_a1 = deck[i]
-            card_a2 = deck[i + 1]
-            card_b1 = deck[i]
-            card_b2 = deck[i + 1]
-            # Example of a sequence win condition: two consecutive high cards
-            E.add_constraint(
-                (Plays("Player A", card_a1, round_number) & Plays("Player A", card_a2, round_number + 1) &
-                 HigherRank(card_a1, card_b1) & HigherRank(card_a2, card_b2)) >>
-                Wins("Player A", round_number + 1)
-            )
-            E.add_constraint(
-                (Plays("Player B", card_b1, round_number) & Plays("Player B", card_b2, round_number + 1) &
-                 HigherRank(card_b1, card_a1) & HigherRank(card_b2, card_a2)) >>
-                Wins("Player B", round_number + 1)
-            )
-def setup_partial_assignments(win_percentage=70, favored_player="Player A"):
-    """Adjust the game to favor a specific player according to the specified win percentage."""
-    total_rounds = 26  # Assuming a full game involves 26 rounds
-    rounds_to_win = int((win_percentage / 100) * total_rounds)
-    favored_rounds = random.sample(range(1, total_rounds + 1), rounds_to_win)
-
+    # The card windows are round-independent, so pair each player's
+    # consecutive-card window against the opponent's once, up front.
+    # The old version compared deck[i] against itself, so the rank
+    # facts in every antecedent were vacuous; the windows now range
+    # over distinct indices and pairs whose ranks are not strictly
+    # higher in both positions are pruned at build time, since their
+    # rank facts can never hold.
+    windows = []
+    for i in range(len(deck) - 1):
+        card_a1, card_a2 = deck[i], deck[i + 1]
+        for j in range(len(deck) - 1):
+            card_b1, card_b2 = deck[j], deck[j + 1]
+            if card_a1.rank > card_b1.rank and card_a2.rank > card_b2.rank:
+                windows.append((
+                    card_a1, card_a2, card_b1, card_b2,
+                    ~_higher_rank(card_a1.rank, card_b1.rank),
+                    ~_higher_rank(card_a2.rank, card_b2.rank),
+                ))
+
+    for round_number in ROUNDS:
+        round_clauses = []
+        for card_a1, card_a2, card_b1, card_b2, not_higher_1, not_higher_2 in windows:
+            # Example of a sequence win condition: two consecutive high
+            # cards. Each implication from a conjunction of literals is
+            # emitted as one flat clause, so CNF conversion adds no
+            # auxiliary variables for this family.
+            round_clauses.append(Or([
+                ~_plays("Player A", card_a1, round_number),
+                ~_plays("Player A", card_a2, round_number + 1),
+                ~_plays("Player B", card_b1, round_number),
+                ~_plays("Player B", card_b2, round_number + 1),
+                not_higher_1, not_higher_2,
+                _wins("Player A", round_number + 1),
+            ]))
+            round_clauses.append(Or([
+                ~_plays("Player B", card_a1, round_number),
+                ~_plays("Player B", card_a2, round_number + 1),
+                ~_plays("Player A", card_b1, round_number),
+                ~_plays("Player A", card_b2, round_number + 1),
+                not_higher_1, not_higher_2,
+                _wins("Player B", round_number + 1),
+            ]))
+        # One merged constraint per round, matching enforce_game_rules.
+        E.add_constraint(And(round_clauses))
+def sample_favored_rounds(win_percentage):
+    """Draws the rounds to bias toward the favored player."""
+    rounds_to_win = int((win_percentage / 100) * TOTAL_ROUNDS)
+    return sorted(_rng.sample(ROUNDS, rounds_to_win))
+
+def setup_partial_assignments(win_percentage=70, favored_player="Player A", favored_rounds=None):
+    """Favoring constraints for a player, as a per-iteration formula.
+
+    Like the deal facts, the sampled favored rounds change every
+    iteration, so the clauses are returned for conjunction with the
+    compiled static theory rather than added to the shared encoding.
+    In each favored round the favored player leads one of the high
+    cards they own; the opponent's reply stays free, so the round is
+    biased toward the favored player without fixing its outcome or
+    contradicting the per-round exactly-one constraints.
+    """
+    if favored_rounds is None:
+        favored_rounds = sample_favored_rounds(win_percentage)
+
+    clauses = []
     for round_number in favored_rounds:
-        for card in deck:
-            if card.rank in [10, 11, 12, 13, 1]:  # High cards: 10, Jack, Queen, King, Ace
-                E.add_constraint(Plays(favored_player, card, round_number))
-                for opponent_card in deck:
-                    if opponent_card.rank < card.rank:
-                        E.add_constraint(Plays("Player B" if favored_player == "Player A" else "Player A", opponent_card, round_number))
-                        E.add_constraint(HigherRank(card, opponent_card) >> Wins(favored_player, round_number))
+        clauses.append(Or([
+            _plays(favored_player, card, round_number) &
+            owned_by(favored_player, card)
+            for card in deck
+            if card.rank in HIGH_RANKS
+        ]))
+
+    return And(clauses)
+
+# Cache for the compiled theory, invalidated when constraints are added.
+_compiled_theory = None
+_compiled_constraint_count = None
+
+def compile_theory():
+    """Compiles the encoding, reusing the cached result when unchanged.
+
+    Compilation walks every constraint and is the dominant non-solver
+    cost, so repeated analysis passes over the same encoding should
+    share one compiled formula.
+    """
+    global _compiled_theory, _compiled_constraint_count
+    n = len(E.constraints) + len(E._custom_constraints)
+    if _compiled_theory is None or _compiled_constraint_count != n:
+        _compiled_theory = E.compile()
+        _compiled_constraint_count = n
+    return _compiled_theory
+
+def solution_owns_bitmask(solution):
+    """Packs a solution's Player A ownership into a 52-bit mask."""
+    mask = 0
+    for i in range(NUM_CARDS):
+        if solution.get(OWNS_A_TABLE[i]):
+            mask |= 1 << i
+    return mask
+
+def solution_plays_bitmask(solution, player, round_number):
+    """Packs the cards a player plays in a round into a 52-bit mask."""
+    plays = PLAYS_TABLE[_PLAYER_INDEX[player]]
+    mask = 0
+    for i in range(NUM_CARDS):
+        if solution.get(plays[i][round_number - 1]):
+            mask |= 1 << i
+    return mask
+
+def check_solution(solution):
+    """Sanity-checks a model with bitmask arithmetic.
+
+    Working on 52-bit masks turns each per-round check into a couple
+    of integer operations (popcount and AND) instead of 52 dictionary
+    lookups per proposition family.
+    """
+    owns_a = solution_owns_bitmask(solution)
+    for round_number in ROUNDS:
+        mask_a = solution_plays_bitmask(solution, "Player A", round_number)
+        mask_b = solution_plays_bitmask(solution, "Player B", round_number)
+        if mask_a.bit_count() != 1 or mask_b.bit_count() != 1:
+            return False
+        if not (mask_a & owns_a) or (mask_b & owns_a):
+            return False
+    return True
+
+# CNF of the static theory, converted once and reused across the
+# per-deal theories built on top of it.
+_static_cnf = None
+_static_cnf_source = None
+
+def static_theory_cnf(T):
+    """CNF conversion of the static theory, cached per formula."""
+    global _static_cnf, _static_cnf_source
+    if _static_cnf is None or _static_cnf_source is not T:
+        _static_cnf_source = T
+        _static_cnf = T.to_CNF(simplify=False)
+    return _static_cnf
+
+def conjoin_with_static_cnf(static_T, dynamic_T):
+    """CNF of static theory AND per-iteration facts.
+
+    CNF conversion is linear in formula size and the static game rules
+    dwarf the per-deal facts, so converting the rules once and merging
+    clause sets removes nearly all of the per-iteration conversion
+    cost.
+    """
+    static_cnf = static_theory_cnf(static_T)
+    dynamic_cnf = dynamic_T.to_CNF(simplify=False)
+    return NNFAnd(static_cnf.children | dynamic_cnf.children)
+
+# d-DNNF cache, tied to the compiled theory it was built from.
+_ddnnf_cache = None
+_ddnnf_source = None
+
+def compile_ddnnf(T=None):
+    """Compiles a theory to d-DNNF once and caches the circuit.
+
+    dsharp pays the model-counting cost a single time per theory;
+    every subsequent query is answered by conditioning the compiled
+    circuit instead of re-running CNF conversion and dsharp per query.
+
+    Returns None for an unsatisfiable theory: dsharp mishandles UNSAT
+    input (it emits a degenerate circuit that counts one model), so
+    satisfiability is established with the solver before compiling.
+    """
+    global _ddnnf_cache, _ddnnf_source
+    if T is None:
+        T = compile_theory()
+    if _ddnnf_cache is None or _ddnnf_source is not T:
+        _ddnnf_source = T
+        cnf = T if T.is_CNF() else T.to_CNF(simplify=False)
+        _ddnnf_cache = dsharp.compile(cnf, smooth=True) if cnf.satisfiable() else None
+    return _ddnnf_cache
+
+def count_models(lit=None, T=None):
+    """Model count of a theory, optionally with a literal set true."""
+    ddnnf = compile_ddnnf(T)
+    if ddnnf is None:
+        return 0
+    if lit is None:
+        return ddnnf.model_count()
+    conditioned = ddnnf.condition({lit: True})
+    # nnf's determinism mark is id-based, so the conditioned copy comes
+    # back unmarked and model_count() would fall into full model
+    # enumeration. Conditioning preserves determinism, so re-mark it to
+    # keep counting a linear circuit traversal.
+    conditioned.mark_deterministic()
+    return conditioned.model_count()
+
+def write_dimacs(path, T=None):
+    """Writes the theory's CNF in DIMACS format for external solvers.
+
+    Lets kissat (or any DIMACS-speaking solver) be run on the encoding
+    directly, without going through the library's solver wrapper.
+    Returns the mapping from propositions to DIMACS variable numbers
+    so answers can be read back.
+    """
+    if T is None:
+        T = compile_theory()
+    cnf = T.to_CNF(simplify=False)
+    var_labels = {name: i for i, name in enumerate(cnf.vars(), start=1)}
+    with open(path, "w") as f:
+        dimacs.dump(cnf, f, mode="cnf", var_labels=var_labels)
+    return var_labels
+
+def marginals(props, T=None):
+    """Marginal probability of each given proposition, in one batch.
+
+    Every query conditions the same cached d-DNNF and the total count
+    is computed once, so k marginals cost k linear circuit traversals
+    rather than k independent counting runs.
+    """
+    total = count_models(T=T)
+    if total == 0:
+        raise ValueError("Cannot compute marginals of an unsatisfiable theory.")
+    return {prop: count_models(prop, T) / total for prop in props}
+
+def _sample_game(hand_a, hand_b, favored_rounds, favored_player):
+    """Plays out one randomly sampled game consistent with the rules.
+
+    Each player plays a uniformly random card from their hand; in
+    favored rounds the favored player leads an owned high card,
+    matching setup_partial_assignments. Ties run through up to
+    MAX_TIE_DEPTH face-up draws, as in resolve_tie_with_quantifiers.
+    Returns (wins, ties, final_ties) with wins keyed by player.
+    """
+    hands = {"Player A": hand_a, "Player B": hand_b}
+    favored_high = [card for card in hands[favored_player] if card.rank in HIGH_RANKS]
+    wins = {player: set() for player in PLAYERS}
+    ties = set()
+    final_ties = set()
+
+    for round_number in ROUNDS:
+        played = {}
+        for player in PLAYERS:
+            if player == favored_player and round_number in favored_rounds and favored_high:
+                played[player] = _rng.choice(favored_high)
+            else:
+                played[player] = _rng.choice(hands[player])
+        rank_a = played["Player A"].rank
+        rank_b = played["Player B"].rank
+
+        if rank_a == rank_b:
+            ties.add(round_number)
+            for _ in range(MAX_TIE_DEPTH):
+                rank_a = _rng.choice(hand_a).rank
+                rank_b = _rng.choice(hand_b).rank
+                if rank_a != rank_b:
+                    break
             else:
-                E.add_constraint(Plays(favored_player, card, round_number))
-                E.add_constraint(Plays("Player B" if favored_player == "Player A" else "Player A", card, round_number) >> Tie(round_number))
-
-    # Ensure only one card is played by each player per round
-    for round_number in range(1, 27):
-        E.add_constraint(one_of([Plays("Player A", card, round_number) for card in deck]))
-        E.add_constraint(one_of([Plays("Player B", card, round_number) for card in deck]))
-
-def print_results():
-    """Prints the results of the simulation."""
-    likelihood_winner_a = likelihood(E, OverallWinner("Player A"))
-    likelihood_winner_b = likelihood(E, OverallWinner("Player B"))
-    print(f"Likelihood of Player A winning: {likelihood_winner_a}")
-    print(f"Likelihood of Player B winning: {likelihood_winner_b}")
-
-def run_simulation(tests=10, win_percentage=75, strategy="normal"):
-    for _ in range(tests):
+                final_ties.add(round_number)
+                continue
+        winner = "Player A" if rank_a > rank_b else "Player B"
+        wins[winner].add(round_number)
+
+    return wins, ties, final_ties
+
+def estimate_marginals(props, hands, favored_rounds=(), favored_player="Player A", samples=2000):
+    """Monte Carlo estimate of outcome-proposition marginals.
+
+    Fallback for when the exact d-DNNF count is out of reach: games
+    are forward-sampled with _sample_game and each proposition is
+    evaluated per sample. Supports the outcome families (Wins, Tie,
+    FinalTie, OverallWinner); plays are sampled, not queried.
+    """
+    hits = {prop: 0 for prop in props}
+    for _ in range(samples):
+        wins, ties, final_ties = _sample_game(*hands, favored_rounds, favored_player)
+        for prop in props:
+            # @proposition wraps the classes in factories, so dispatch
+            # on the underlying type name rather than isinstance.
+            family = type(prop).__name__
+            if family == "Wins":
+                hit = prop.round_number in wins[prop.player]
+            elif family == "Tie":
+                hit = prop.round_number in ties
+            elif family == "FinalTie":
+                hit = prop.round_number in final_ties
+            elif family == "OverallWinner":
+                opponent = "Player B" if prop.player == "Player A" else "Player A"
+                hit = len(wins[prop.player]) > len(wins[opponent])
+            else:
+                raise ValueError(f"Cannot estimate the marginal of {prop}.")
+            if hit:
+                hits[prop] += 1
+    return {prop: count / samples for prop, count in hits.items()}
+
+def analyze_round_wins(T=None):
+    """Per-round win marginals for both players."""
+    return marginals(
+        [_wins(player, round_number)
+         for player in PLAYERS
+         for round_number in ROUNDS],
+        T,
+    )
+
+def print_results(T=None):
+    """Prints the results of the simulation.
+
+    All counting queries condition one shared d-DNNF, so adding more
+    queries costs circuit traversals, not extra solver runs.
+    """
+    winner_marginals = marginals([_overall_winner("Player A"), _overall_winner("Player B")], T)
+    print(f"Likelihood of Player A winning: {winner_marginals[_overall_winner('Player A')]}")
+    print(f"Likelihood of Player B winning: {winner_marginals[_overall_winner('Player B')]}")
+
+def build_static_theory():
+    """Encodes the deal-independent constraints once.
+
+    The rank facts, game rules, win conditions, tie-breaking, and the
+    overall-winner counters never change between iterations; only the
+    deal and the sampled partial assignments do. Building the static
+    part a single time lets every iteration reuse one compiled theory
+    and conjoin just its own facts.
+    """
+    setup_rank_comparisons()
+    enforce_game_rules()
+    enforce_variable_win_conditions()
+    handle_tie_breaking()
+    determine_overall_winner()
+
+def example_theory():
+    """Deal-independent theory with suit symmetry breaking applied."""
+    build_static_theory()
+    setup_suit_symmetry_breaking()
+    return compile_theory()
+
+# Compiled static theory shared with pool workers. Set before the pool
+# forks so every worker inherits it instead of rebuilding.
+_simulation_static_T = None
+
+def _simulation_iteration(args):
+    """One independent simulation run; returns its report as text.
+
+    Runs inside a pool worker. Output is captured rather than printed
+    so reports from concurrent iterations do not interleave.
+    """
+    global _simulation_static_T
+    seed, win_percentage, strategy = args
+    set_seed(seed)
+
+    if _simulation_static_T is None:
+        # Spawn start method: the forked copy of the theory is absent.
+        build_static_theory()
+        _simulation_static_T = compile_theory()
+
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
         if strategy == "biased":
-            setup_strategic_card_distribution()
+            hands = setup_strategic_card_distribution()
         else:
-            shuffle_and_setup_deck()
-        
-        setup_rank_comparisons()
-        enforce_game_rules()
-        enforce_variable_win_conditions()
-        setup_partial_assignments(win_percentage=win_percentage, favored_player="Player A")
-        handle_tie_breaking()
-        determine_overall_winner()
-        print_results()
+            hands = shuffle_and_setup_deck()
+
+        # The dealt hands are fully ground, so their round-by-round
+        # outcome needs no SAT call.
+        wins_a, wins_b, ties = evaluate_ground_deal(*hands)
+        print(f"Dealt outcome: Player A wins {wins_a}, Player B wins {wins_b}, ties {ties}")
+
+        favored_rounds = sample_favored_rounds(win_percentage)
+        favoring = setup_partial_assignments(favored_player="Player A", favored_rounds=favored_rounds)
+        dynamic_T = deal_facts(*hands).compile() & favoring.compile()
+        try:
+            print_results(conjoin_with_static_cnf(_simulation_static_T, dynamic_T))
+        except (RuntimeError, MemoryError):
+            # dsharp could not compile the per-iteration theory on this
+            # machine; estimate the winner marginals by sampling instead.
+            winner_props = [_overall_winner(player) for player in PLAYERS]
+            estimates = estimate_marginals(winner_props, hands, favored_rounds, "Player A")
+            print(f"Likelihood of Player A winning (sampled): {estimates[winner_props[0]]}")
+            print(f"Likelihood of Player B winning (sampled): {estimates[winner_props[1]]}")
+    return buffer.getvalue()
+
+def run_simulation(tests=10, win_percentage=75, strategy="normal", workers=2):
+    """Runs independent simulation iterations, a few at a time.
+
+    `workers` bounds the pool size. Each worker runs its own dsharp
+    compilation, which is the memory-hungry step, so the default stays
+    well below the core count; raise it only on machines with memory
+    to spare for `workers` concurrent counters.
+    """
+    global _simulation_static_T
+    build_static_theory()
+    _simulation_static_T = compile_theory()
+    # Convert the static rules to CNF before forking so workers inherit
+    # the conversion instead of redoing it.
+    static_theory_cnf(_simulation_static_T)
+
+    # Iterations are fully independent problems, so they are dispatched
+    # across workers; each runs its own solver and counter processes.
+    # Per-iteration seeds keep the deals distinct and the whole run
+    # reproducible under set_seed().
+    seeds = [_rng.randrange(2 ** 32) for _ in range(tests)]
+    jobs = [(seed, win_percentage, strategy) for seed in seeds]
+    processes = max(1, min(tests, workers, os.cpu_count() or 1))
+    with multiprocessing.Pool(processes=processes) as pool:
+        for report in pool.imap(_simulation_iteration, jobs):
+            print(report, end="")
 
 if __name__ == "__main__":
     run_simulation(tests=10, win_percentage=75, strategy="biased")
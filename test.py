@@ -1,14 +1,44 @@
 
 import os, sys
 
-from run import example_theory
+import run
+from run import check_solution, deck, exactly_one, _owns, _plays
 
 USAGE = '\n\tpython3 test.py [draft|final]\n'
 EXPECTED_VAR_MIN = 10
 EXPECTED_CONS_MIN = 50
 
+def test_exactly_one():
+    x = _plays("Player A", deck[0], 1)
+    y = _plays("Player A", deck[1], 1)
+    T = exactly_one([x, y], ("test exactly one", 0)).compile()
+    models = list(T.models())
+    assert len(models) == 2, "exactly_one over two variables should have exactly 2 models, got %d" % len(models)
+
+def test_check_solution():
+    # Build a model dict the way the solver returns one: keyed by the
+    # proposition objects, one entry per ownership and play variable.
+    hand_a, hand_b = deck[:26], deck[26:]
+    solution = {_owns("Player A", card): card in set(hand_a) for card in deck}
+    for round_number in range(1, 27):
+        for player, hand in (("Player A", hand_a), ("Player B", hand_b)):
+            played = hand[round_number - 1]
+            for card in deck:
+                solution[_plays(player, card, round_number)] = card is played
+    assert check_solution(solution), "A consistent deal-and-plays model should pass"
+
+    # Playing a second card in a round breaks exactly-one.
+    solution[_plays("Player A", hand_a[1], 1)] = True
+    assert not check_solution(solution), "Two cards played in one round should fail"
+    solution[_plays("Player A", hand_a[1], 1)] = False
+
+    # Playing a card the player does not own breaks ownership.
+    solution[_plays("Player A", hand_a[0], 1)] = False
+    solution[_plays("Player A", hand_b[0], 1)] = True
+    assert not check_solution(solution), "Playing an unowned card should fail"
+
 def test_theory():
-    T = example_theory()
+    T = run.example_theory()
 
     assert len(T.vars()) > EXPECTED_VAR_MIN, "Only %d variables -- your theory is likely not sophisticated enough for the course project." % len(T.vars())
     assert T.size() > EXPECTED_CONS_MIN, "Only %d operators in the formula -- your theory is likely not sophisticated enough for the course project." % T.size()